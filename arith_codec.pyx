@@ -0,0 +1,298 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+
+from libc.stdlib cimport malloc, realloc, free
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+ctypedef unsigned long long u64
+
+
+cdef u64 *load_cumulative(freqs, Py_ssize_t numsym, u64 maximum_total) except NULL:
+	total = freqs.get_total()
+	if total > maximum_total:
+		raise ValueError("Cannot code symbol because total is too large")
+	cdef u64 *cumul = <u64 *> malloc((numsym + 1) * sizeof(u64))
+	if cumul == NULL:
+		raise MemoryError()
+	cdef Py_ssize_t i
+	for i in range(numsym):
+		cumul[i] = freqs.get_low(i)
+	cumul[numsym] = total
+	return cumul
+
+
+cdef class ByteBuffer:
+	cdef unsigned char *data
+	cdef Py_ssize_t length
+	cdef Py_ssize_t capacity
+
+	def __cinit__(self):
+		self.capacity = 1 << 16
+		self.length = 0
+		self.data = <unsigned char *> malloc(self.capacity)
+		if self.data == NULL:
+			raise MemoryError()
+
+	def __dealloc__(self):
+		free(self.data)
+
+	cdef int append(self, unsigned char b) except -1:
+		cdef unsigned char *grown
+		if self.length == self.capacity:
+			grown = <unsigned char *> realloc(self.data, self.capacity * 2)
+			if grown == NULL:
+				raise MemoryError()
+			self.data = grown
+			self.capacity *= 2
+		self.data[self.length] = b
+		self.length += 1
+		return 0
+
+	cdef bytes take(self):
+		result = PyBytes_FromStringAndSize(<char *> self.data, self.length)
+		self.length = 0
+		return result
+
+
+cdef class Encoder:
+	cdef int num_state_bits
+	cdef u64 half_range
+	cdef u64 quarter_range
+	cdef u64 state_mask
+	cdef u64 low
+	cdef u64 high
+	cdef u64 num_underflow
+	cdef u64 total
+	cdef u64 *cumul
+	cdef Py_ssize_t numsym
+	cdef ByteBuffer output
+	cdef unsigned int currentbyte
+	cdef unsigned int numbitsfilled
+
+	def __cinit__(self, int numbits, freqs):
+		if not (1 <= numbits <= 32):
+			raise ValueError("State size out of range")
+		self.num_state_bits = numbits
+		self.half_range = (<u64> 1) << (numbits - 1)
+		self.quarter_range = self.half_range >> 1
+		self.state_mask = ((<u64> 1) << numbits) - 1
+		self.low = 0
+		self.high = self.state_mask
+		self.num_underflow = 0
+		self.numsym = freqs.get_symbol_limit()
+		self.cumul = load_cumulative(freqs, self.numsym, self.quarter_range + 2)
+		self.total = self.cumul[self.numsym]
+		self.output = ByteBuffer()
+		self.currentbyte = 0
+		self.numbitsfilled = 0
+
+	def __dealloc__(self):
+		free(self.cumul)
+
+	cdef int put_bit(self, unsigned int bit) except -1:
+		self.currentbyte = (self.currentbyte << 1) | bit
+		self.numbitsfilled += 1
+		if self.numbitsfilled == 8:
+			self.output.append(<unsigned char> self.currentbyte)
+			self.currentbyte = 0
+			self.numbitsfilled = 0
+		return 0
+
+	cdef int update(self, Py_ssize_t symbol) except -1:
+		if not (0 <= symbol < self.numsym):
+			raise ValueError("Symbol out of range")
+		cdef u64 symlow = self.cumul[symbol]
+		cdef u64 symhigh = self.cumul[symbol + 1]
+		if symlow == symhigh:
+			raise ValueError("Symbol has zero frequency")
+		cdef u64 half_range = self.half_range
+		cdef u64 state_mask = self.state_mask
+		cdef u64 low = self.low
+		cdef u64 high = self.high
+		cdef u64 num_underflow = self.num_underflow
+		cdef u64 width = high - low + 1
+		cdef unsigned int bit
+		high = low + symhigh * width // self.total - 1
+		low  = low + symlow  * width // self.total
+
+		while ((low ^ high) & half_range) == 0:
+			bit = <unsigned int> (low >> (self.num_state_bits - 1))
+			self.put_bit(bit)
+			while num_underflow > 0:
+				self.put_bit(bit ^ 1)
+				num_underflow -= 1
+			low  = ((low  << 1) & state_mask)
+			high = ((high << 1) & state_mask) | 1
+
+		while (low & ~high & self.quarter_range) != 0:
+			num_underflow += 1
+			low = (low << 1) ^ half_range
+			high = ((high ^ half_range) << 1) | half_range | 1
+		self.low = low
+		self.high = high
+		self.num_underflow = num_underflow
+		return 0
+
+	def write(self, Py_ssize_t symbol):
+		self.update(symbol)
+		return self.output.take()
+
+	def write_symbols(self, const unsigned char[::1] symbols):
+		cdef Py_ssize_t i
+		for i in range(symbols.shape[0]):
+			self.update(symbols[i])
+		return self.output.take()
+
+	def finish(self):
+		self.put_bit(1)
+		while self.num_underflow > 0:
+			self.put_bit(0)
+			self.num_underflow -= 1
+		while self.numbitsfilled != 0:
+			self.put_bit(0)
+		return self.output.take()
+
+
+cdef class Decoder:
+	cdef int num_state_bits
+	cdef u64 half_range
+	cdef u64 quarter_range
+	cdef u64 state_mask
+	cdef u64 low
+	cdef u64 high
+	cdef u64 code
+	cdef u64 total
+	cdef u64 *cumul
+	cdef Py_ssize_t numsym
+	cdef Py_ssize_t eof_symbol
+	cdef bytes pending
+	cdef Py_ssize_t bitpos
+	cdef bint started
+	cdef readonly bint finished
+	cdef ByteBuffer output
+
+	def __cinit__(self, int numbits, freqs, Py_ssize_t eof_symbol):
+		if not (1 <= numbits <= 32):
+			raise ValueError("State size out of range")
+		self.num_state_bits = numbits
+		self.half_range = (<u64> 1) << (numbits - 1)
+		self.quarter_range = self.half_range >> 1
+		self.state_mask = ((<u64> 1) << numbits) - 1
+		self.low = 0
+		self.high = self.state_mask
+		self.code = 0
+		self.numsym = freqs.get_symbol_limit()
+		self.cumul = load_cumulative(freqs, self.numsym, self.quarter_range + 2)
+		self.total = self.cumul[self.numsym]
+		self.eof_symbol = eof_symbol
+		self.pending = b""
+		self.bitpos = 0
+		self.started = False
+		self.finished = False
+		self.output = ByteBuffer()
+
+	def __dealloc__(self):
+		free(self.cumul)
+
+	def read(self, const unsigned char[::1] block):
+		if self.finished:
+			return b""
+		self.pending = self.pending[self.bitpos >> 3 : ] + bytes(block)
+		self.bitpos &= 7
+		self.decode(False)
+		return self.output.take()
+
+	def finish(self):
+		if not self.finished:
+			self.decode(True)
+		return self.output.take()
+
+	cdef int decode(self, bint final) except -1:
+		cdef const unsigned char[::1] data = self.pending
+		cdef Py_ssize_t numbits_in = data.shape[0] * 8
+		cdef Py_ssize_t numbits = self.num_state_bits
+		cdef Py_ssize_t margin = 2 * numbits
+		cdef Py_ssize_t bitpos = self.bitpos
+		cdef u64 half_range = self.half_range
+		cdef u64 quarter_range = self.quarter_range
+		cdef u64 state_mask = self.state_mask
+		cdef u64 total = self.total
+		cdef u64 *cumul = self.cumul
+		cdef Py_ssize_t numsym = self.numsym
+		cdef u64 low = self.low
+		cdef u64 high = self.high
+		cdef u64 code = self.code
+		cdef u64 width, offset, value, symlow, symhigh
+		cdef Py_ssize_t start, end, middle, i
+
+		if not self.started:
+			if not final and numbits_in - bitpos < numbits:
+				return 0
+			for i in range(numbits):
+				code <<= 1
+				if bitpos < numbits_in:
+					code |= (data[bitpos >> 3] >> (7 - (bitpos & 7))) & 1
+				bitpos += 1
+			self.started = True
+
+		try:
+			while True:
+				if final:
+					if bitpos > numbits_in + numbits:
+						raise ValueError("Stream ended before the end-of-stream symbol")
+				elif numbits_in - bitpos < margin:
+					break
+				width = high - low + 1
+				offset = code - low
+				value = ((offset + 1) * total - 1) // width
+				if value >= total:
+					raise AssertionError("Code out of range")
+				start = 0
+				if numsym > 8 and value < cumul[8]:
+					while cumul[start + 1] <= value:
+						start += 1
+				else:
+					end = numsym
+					while end - start > 1:
+						middle = (start + end) >> 1
+						if cumul[middle] > value:
+							end = middle
+						else:
+							start = middle
+				if start == self.eof_symbol:
+					self.finished = True
+					break
+				if start > 255:
+					raise ValueError("Decoded symbol does not fit in a byte")
+				self.output.append(<unsigned char> start)
+
+				symlow = cumul[start]
+				symhigh = cumul[start + 1]
+				high = low + symhigh * width // total - 1
+				low  = low + symlow  * width // total
+
+				while ((low ^ high) & half_range) == 0:
+					code = (code << 1) & state_mask
+					if bitpos < numbits_in:
+						code |= (data[bitpos >> 3] >> (7 - (bitpos & 7))) & 1
+					bitpos += 1
+					low  = ((low  << 1) & state_mask)
+					high = ((high << 1) & state_mask) | 1
+
+				while (low & ~high & quarter_range) != 0:
+					code = (code & half_range) | ((code << 1) & (state_mask >> 1))
+					if bitpos < numbits_in:
+						code |= (data[bitpos >> 3] >> (7 - (bitpos & 7))) & 1
+					bitpos += 1
+					low = (low << 1) ^ half_range
+					high = ((high ^ half_range) << 1) | half_range | 1
+		finally:
+			self.low = low
+			self.high = high
+			self.code = code
+			if bitpos >= numbits_in:
+				self.pending = b""
+				self.bitpos = 0
+			else:
+				self.pending = self.pending[bitpos >> 3 : ]
+				self.bitpos = bitpos & 7
+		return 0
@@ -1,8 +1,28 @@
 from cryptography.fernet import Fernet
+import array, bisect, inspect, itertools, queue, re, struct, textwrap, threading
+import os
 from pathlib import Path
 
+try:
+	import arith_codec
+except ImportError:
+	arith_codec = None
+	if os.environ.get("ARITH_CODEC_BUILD"):
+		try:
+			import pyximport
+		except ImportError:
+			pyximport = None
+		if pyximport is not None:
+			importers = pyximport.install(language_level=3, inplace=True)
+			try:
+				import arith_codec
+			except ImportError:
+				arith_codec = None
+			finally:
+				pyximport.uninstall(*importers)
+
 class ArithmeticCoderBase:
-	def __init__(self, numbits):
+	def __init__(self, numbits, checked=True):
 		if numbits < 1:
 			raise ValueError("State size out of range")
 		self.num_state_bits = numbits
@@ -14,6 +34,24 @@ class ArithmeticCoderBase:
 		self.state_mask = self.full_range - 1
 		self.low = 0
 		self.high = self.state_mask
+		self.checked = checked
+		self.freqs = None
+		self.boundfreqs = None
+		self.total = None
+		self.version = None
+	
+	def _bind(self, freqs):
+		if self.checked and not isinstance(freqs, CheckedFrequencyTable):
+			boundfreqs = CheckedFrequencyTable(freqs)
+		else:
+			boundfreqs = freqs
+		total = boundfreqs.get_total()
+		if total > self.maximum_total:
+			raise ValueError("Cannot code symbol because total is too large")
+		self.freqs = freqs
+		self.boundfreqs = boundfreqs
+		self.total = total
+		self.version = getattr(freqs, "version", None)
 	
 	def update(self, freqs, symbol):
 		low = self.low
@@ -24,106 +62,174 @@ class ArithmeticCoderBase:
 		if not (self.minimum_range <= range <= self.full_range):
 			raise AssertionError("Range out of range")
 	
-		total = freqs.get_total()
-		symlow = freqs.get_low(symbol)
-		symhigh = freqs.get_high(symbol)
+		total = self.total
+		symlow, symhigh = freqs.get_range(symbol)
 		if symlow == symhigh:
 			raise ValueError("Symbol has zero frequency")
-		if total > self.maximum_total:
-			raise ValueError("Cannot code symbol because total is too large")
 		
 		newlow  = low + symlow  * range // total
 		newhigh = low + symhigh * range // total - 1
 		self.low = newlow
 		self.high = newhigh
 		
-		while ((self.low ^ self.high) & self.half_range) == 0:
-			self.shift()
-			self.low  = ((self.low  << 1) & self.state_mask)
-			self.high = ((self.high << 1) & self.state_mask) | 1
+		count = self.num_state_bits - (newlow ^ newhigh).bit_length()
+		if count > 0:
+			self.shift(count)
+			newlow  = ((newlow  << count) & self.state_mask)
+			newhigh = ((newhigh << count) & self.state_mask) | ((1 << count) - 1)
+			self.low = newlow
+			self.high = newhigh
 		
-		while (self.low & ~self.high & self.quarter_range) != 0:
-			self.underflow()
-			self.low = (self.low << 1) ^ self.half_range
-			self.high = ((self.high ^ self.half_range) << 1) | self.half_range | 1
-	
-	def shift(self):
+		lowmask = self.half_range - 1
+		count = self.num_state_bits - 1 - ((~newlow | newhigh) & lowmask).bit_length()
+		if count > 0:
+			self.underflow(count)
+			self.low = (newlow << count) & lowmask
+			self.high = ((newhigh << count) & lowmask) | self.half_range | ((1 << count) - 1)
+	
+	def shift(self, count):
 		raise NotImplementedError()
 	
-	def underflow(self):
+	def underflow(self, count):
 		raise NotImplementedError()
 
 class ArithmeticEncoder(ArithmeticCoderBase):
-	def __init__(self, numbits, bitout):
-		super(ArithmeticEncoder, self).__init__(numbits)
+	def __init__(self, numbits, bitout, checked=True):
+		super(ArithmeticEncoder, self).__init__(numbits, checked)
 		self.output = bitout
 		self.num_underflow = 0
 	
 	def write(self, freqs, symbol):
-		if not isinstance(freqs, CheckedFrequencyTable):
-			freqs = CheckedFrequencyTable(freqs)
-		self.update(freqs, symbol)
+		if freqs is not self.freqs or self.version is None or freqs.version != self.version:
+			self._bind(freqs)
+		self.update(self.boundfreqs, symbol)
+	
+	def write_symbols(self, freqs, symbols):
+		if freqs is not self.freqs or self.version is None or freqs.version != self.version:
+			self._bind(freqs)
+		freqs = self.boundfreqs
+		total = freqs.get_total()
+		if total > self.maximum_total:
+			raise ValueError("Cannot code symbol because total is too large")
+		numsym = freqs.get_symbol_limit()
+		cumul = [freqs.get_low(i) for i in range(numsym)]
+		cumul.append(total)
+		
+		half_range = self.half_range
+		state_mask = self.state_mask
+		lowmask = half_range - 1
+		numbits = self.num_state_bits
+		emit = self._emit
+		low = self.low
+		high = self.high
+		num_underflow = self.num_underflow
+		try:
+			for symbol in symbols:
+				if not (0 <= symbol < numsym):
+					raise ValueError("Symbol out of range")
+				symlow = cumul[symbol]
+				symhigh = cumul[symbol + 1]
+				if symlow == symhigh:
+					raise ValueError("Symbol has zero frequency")
+				width = high - low + 1
+				high = low + symhigh * width // total - 1
+				low  = low + symlow  * width // total
+				
+				count = numbits - (low ^ high).bit_length()
+				if count > 0:
+					emit(low, count, num_underflow)
+					num_underflow = 0
+					low  = ((low  << count) & state_mask)
+					high = ((high << count) & state_mask) | ((1 << count) - 1)
+				
+				count = numbits - 1 - ((~low | high) & lowmask).bit_length()
+				if count > 0:
+					num_underflow += count
+					low = (low << count) & lowmask
+					high = ((high << count) & lowmask) | half_range | ((1 << count) - 1)
+		finally:
+			self.low = low
+			self.high = high
+			self.num_underflow = num_underflow
 	
 	def finish(self):
-		self.output.write(1)
+		self.output.write_bits(1 << self.num_underflow, self.num_underflow + 1)
+		self.num_underflow = 0
 	
-	def shift(self):
-		bit = self.low >> (self.num_state_bits - 1)
-		self.output.write(bit)
-		for _ in range(self.num_underflow):
-			self.output.write(bit ^ 1)
+	def shift(self, count):
+		self._emit(self.low, count, self.num_underflow)
 		self.num_underflow = 0
 	
-	def underflow(self):
-		self.num_underflow += 1
+	def _emit(self, low, count, underflow):
+		bits = low >> (self.num_state_bits - count)
+		if underflow > 0:
+			rest = count - 1
+			bit = bits >> rest
+			bits = ((((bit << underflow) | ((1 << underflow) - 1) * (bit ^ 1)) << rest)
+				| (bits & ((1 << rest) - 1)))
+		self.output.write_bits(bits, count + underflow)
+	
+	def underflow(self, count):
+		self.num_underflow += count
 
 class ArithmeticDecoder(ArithmeticCoderBase):
-	def __init__(self, numbits, bitin):
-		super(ArithmeticDecoder, self).__init__(numbits)
+	def __init__(self, numbits, bitin, checked=True):
+		super(ArithmeticDecoder, self).__init__(numbits, checked)
 		self.input = bitin
-		self.code = 0
-		for _ in range(self.num_state_bits):
-			self.code = self.code << 1 | self.read_code_bit()
+		self.code = self.input.read_bits(self.num_state_bits)
 	
 	def read(self, freqs):
-		if not isinstance(freqs, CheckedFrequencyTable):
-			freqs = CheckedFrequencyTable(freqs)
-		total = freqs.get_total()
-		if total > self.maximum_total:
-			raise ValueError("Cannot decode symbol because total is too large")
+		if freqs is not self.freqs or self.version is None or freqs.version != self.version:
+			self._bind(freqs)
+		freqs = self.boundfreqs
+		total = self.total
 		range = self.high - self.low + 1
 		offset = self.code - self.low
 		value = ((offset + 1) * total - 1) // range
-		assert value * range // total <= offset
 		assert 0 <= value < total
-		start = 0
-		end = freqs.get_symbol_limit()
-		while end - start > 1:
-			middle = (start + end) >> 1
-			if freqs.get_low(middle) > value:
-				end = middle
-			else:
-				start = middle
-		assert start + 1 == end
-		
-		symbol = start
-		assert freqs.get_low(symbol) * range // total <= offset < freqs.get_high(symbol) * range // total
+		symbol = freqs.get_symbol(value)
 		self.update(freqs, symbol)
 		if not (self.low <= self.code <= self.high):
 			raise AssertionError("Code out of range")
 		return symbol
 	
-	def shift(self):
-		self.code = ((self.code << 1) & self.state_mask) | self.read_code_bit()
+	def shift(self, count):
+		self.code = ((self.code << count) & self.state_mask) | self.input.read_bits(count)
 	
-	def underflow(self):
-		self.code = (self.code & self.half_range) | ((self.code << 1) & (self.state_mask >> 1)) | self.read_code_bit()
+	def underflow(self, count):
+		self.code = (self.code & self.half_range) | ((self.code << count) & (self.state_mask >> 1)) | self.input.read_bits(count)
+
+_STATE_CONSTANTS = ("num_state_bits", "full_range", "half_range", "quarter_range",
+	"minimum_range", "maximum_total", "state_mask")
+
+def _specialize(function, numbits):
+	try:
+		source = textwrap.dedent(inspect.getsource(function))
+	except OSError:
+		return function
+	coder = ArithmeticCoderBase(numbits)
+	pattern = r"\bself\.(" + "|".join(_STATE_CONSTANTS) + r")\b"
+	source = re.sub(pattern, lambda m: str(getattr(coder, m.group(1))), source)
+	namespace = {}
+	exec(source, globals(), namespace)
+	return namespace[function.__name__]
+
+class ArithmeticEncoder32(ArithmeticEncoder):
+	update = _specialize(ArithmeticCoderBase.update, 32)
+	shift = _specialize(ArithmeticEncoder.shift, 32)
+	_emit = _specialize(ArithmeticEncoder._emit, 32)
 	
-	def read_code_bit(self):
-		temp = self.input.read()
-		if temp == -1:
-			temp = 0
-		return temp
+	def __init__(self, bitout, checked=True):
+		super(ArithmeticEncoder32, self).__init__(32, bitout, checked)
+
+class ArithmeticDecoder32(ArithmeticDecoder):
+	update = _specialize(ArithmeticCoderBase.update, 32)
+	read = _specialize(ArithmeticDecoder.read, 32)
+	shift = _specialize(ArithmeticDecoder.shift, 32)
+	underflow = _specialize(ArithmeticDecoder.underflow, 32)
+	
+	def __init__(self, bitin, checked=True):
+		super(ArithmeticDecoder32, self).__init__(32, bitin, checked)
 
 class FrequencyTable:
 	def get_symbol_limit(self):
@@ -146,12 +252,31 @@ class FrequencyTable:
     
 	def get_high(self, symbol):
 		raise NotImplementedError()
+	
+	def get_range(self, symbol):
+		return (self.get_low(symbol), self.get_high(symbol))
+	
+	def get_symbol(self, value):
+		start = 0
+		end = self.get_symbol_limit()
+		while end - start > 1:
+			middle = (start + end) >> 1
+			if self.get_low(middle) > value:
+				end = middle
+			else:
+				start = middle
+		assert start + 1 == end
+		return start
 
 class CheckedFrequencyTable(FrequencyTable):
 	
 	def __init__(self, freqtab):
 		self.freqtable = freqtab
 	
+	@property
+	def version(self):
+		return getattr(self.freqtable, "version", None)
+	
 	def get_symbol_limit(self):
 		result = self.freqtable.get_symbol_limit()
 		if result <= 0:
@@ -194,6 +319,24 @@ class CheckedFrequencyTable(FrequencyTable):
 			self.freqtable.get_high(symbol)
 			raise AssertionError("ValueError expected")
 	
+	def get_range(self, symbol):
+		if self._is_symbol_in_range(symbol):
+			low, high = self.freqtable.get_range(symbol)
+			if not (0 <= low <= high <= self.freqtable.get_total()):
+				raise AssertionError("Symbol cumulative frequency range out of range")
+			return (low, high)
+		else:
+			self.freqtable.get_range(symbol)
+			raise AssertionError("ValueError expected")
+	
+	def get_symbol(self, value):
+		symbol = self.freqtable.get_symbol(value)
+		if not self._is_symbol_in_range(symbol):
+			raise AssertionError("Symbol out of range")
+		if not (self.freqtable.get_low(symbol) <= value < self.freqtable.get_high(symbol)):
+			raise AssertionError("Value not in symbol range")
+		return symbol
+	
 	def __str__(self):
 		return "CheckedFrequencyTable (" + str(self.freqtable) + ")"
 	
@@ -211,6 +354,10 @@ class CheckedFrequencyTable(FrequencyTable):
 		return 0 <= symbol < self.get_symbol_limit()
 
 class SimpleFrequencyTable(FrequencyTable):
+	SYMBOL_TABLE_LIMIT = 1 << 20
+	SYMBOL_TABLE_LOOKUP_RATIO = 64
+	LINEAR_SEARCH_LIMIT = 8
+	
 	def __init__(self, freqs):
 		if isinstance(freqs, FrequencyTable):
 			numsym = freqs.get_symbol_limit()
@@ -227,6 +374,9 @@ class SimpleFrequencyTable(FrequencyTable):
 		self.total = sum(self.frequencies)
 		
 		self.cumulative = None
+		self.symbols = None
+		self.lookups = 0
+		self.version = 0
 	
 	def get_symbol_limit(self):
 		return len(self.frequencies)
@@ -244,12 +394,18 @@ class SimpleFrequencyTable(FrequencyTable):
 		self.total = temp + freq
 		self.frequencies[symbol] = freq
 		self.cumulative = None
+		self.symbols = None
+		self.lookups = 0
+		self.version += 1
 	
 	def increment(self, symbol):
 		self._check_symbol(symbol)
 		self.total += 1
 		self.frequencies[symbol] += 1
 		self.cumulative = None
+		self.symbols = None
+		self.lookups = 0
+		self.version += 1
 	
 	def get_total(self):
 		return self.total
@@ -266,13 +422,47 @@ class SimpleFrequencyTable(FrequencyTable):
 			self._init_cumulative()
 		return self.cumulative[symbol + 1]
 	
+	def get_range(self, symbol):
+		self._check_symbol(symbol)
+		cumul = self.cumulative
+		if cumul is None:
+			self._init_cumulative()
+			cumul = self.cumulative
+		return (cumul[symbol], cumul[symbol + 1])
+	
+	def get_symbol(self, value):
+		if not (0 <= value < self.total):
+			raise ValueError("Value out of range")
+		if self.symbols is None:
+			if self.total > self.SYMBOL_TABLE_LIMIT or self.lookups * self.SYMBOL_TABLE_LOOKUP_RATIO < self.total:
+				self.lookups += 1
+				return self._search_cumulative(value)
+			self._init_symbols()
+		return self.symbols[value]
+	
+	def _search_cumulative(self, value):
+		cumul = self.cumulative
+		if cumul is None:
+			self._init_cumulative()
+			cumul = self.cumulative
+		limit = self.LINEAR_SEARCH_LIMIT
+		if limit < len(cumul) and value < cumul[limit]:
+			symbol = 0
+			while cumul[symbol + 1] <= value:
+				symbol += 1
+			return symbol
+		return bisect.bisect_right(cumul, value) - 1
+	
+	def _init_symbols(self):
+		symbols = array.array("I")
+		for (symbol, freq) in enumerate(self.frequencies):
+			symbols += array.array("I", (symbol,)) * freq
+		assert len(symbols) == self.total
+		self.symbols = symbols
+	
 	def _init_cumulative(self):
-		cumul = [0]
-		sum = 0
-		for freq in self.frequencies:
-			sum += freq
-			cumul.append(sum)
-		assert sum == self.total
+		cumul = list(itertools.accumulate(self.frequencies, initial=0))
+		assert cumul[-1] == self.total
 		self.cumulative = cumul
 	
 	def _check_symbol(self, symbol):
@@ -290,6 +480,8 @@ class SimpleFrequencyTable(FrequencyTable):
 class BitInputStream:
 	def __init__(self, inp):
 		self.input = inp
+		self.buffer = b""
+		self.position = 0
 		self.currentbyte = 0
 		self.numbitsremaining = 0
 	
@@ -297,16 +489,58 @@ class BitInputStream:
 		if self.currentbyte == -1:
 			return -1
 		if self.numbitsremaining == 0:
-			temp = self.input.read(1)
-			if len(temp) == 0:
-				self.currentbyte = -1
-				return -1
-			self.currentbyte = temp[0]
+			if self.position == len(self.buffer):
+				self.buffer = self.input.read(1 << 16)
+				self.position = 0
+				if len(self.buffer) == 0:
+					self.currentbyte = -1
+					return -1
+			self.currentbyte = self.buffer[self.position]
+			self.position += 1
 			self.numbitsremaining = 8
 		assert self.numbitsremaining > 0
 		self.numbitsremaining -= 1
 		return (self.currentbyte >> self.numbitsremaining) & 1
 	
+	def read_block(self, n):
+		self.numbitsremaining = 0
+		if self.position == len(self.buffer):
+			return self.input.read(n)
+		result = self.buffer[self.position : self.position + n]
+		self.position += len(result)
+		return result
+	
+	def read_bytes(self, n):
+		self.numbitsremaining = 0
+		result = self.buffer[self.position : self.position + n]
+		self.position += len(result)
+		if len(result) < n:
+			result += self.input.read(n - len(result))
+		if len(result) < n:
+			raise EOFError()
+		return result
+	
+	def read_bits(self, n):
+		result = 0
+		while n > 0:
+			if self.numbitsremaining == 0:
+				if self.currentbyte == -1:
+					return result << n
+				if self.position == len(self.buffer):
+					self.buffer = self.input.read(1 << 16)
+					self.position = 0
+					if len(self.buffer) == 0:
+						self.currentbyte = -1
+						return result << n
+				self.currentbyte = self.buffer[self.position]
+				self.position += 1
+				self.numbitsremaining = 8
+			count = min(n, self.numbitsremaining)
+			self.numbitsremaining -= count
+			result = (result << count) | ((self.currentbyte >> self.numbitsremaining) & ((1 << count) - 1))
+			n -= count
+		return result
+	
 	def read_no_eof(self):
 		result = self.read()
 		if result != -1:
@@ -316,12 +550,15 @@ class BitInputStream:
 	
 	def close(self):
 		self.input.close()
+		self.buffer = b""
+		self.position = 0
 		self.currentbyte = -1
 		self.numbitsremaining = 0
 
 class BitOutputStream:
 	def __init__(self, out):
 		self.output = out
+		self.buffer = bytearray()
 		self.currentbyte = 0
 		self.numbitsfilled = 0
 	
@@ -331,43 +568,162 @@ class BitOutputStream:
 		self.currentbyte = (self.currentbyte << 1) | b
 		self.numbitsfilled += 1
 		if self.numbitsfilled == 8:
-			towrite = bytes((self.currentbyte,))
-			self.output.write(towrite)
+			self.buffer.append(self.currentbyte)
 			self.currentbyte = 0
 			self.numbitsfilled = 0
-      
-	def close(self):
+			if len(self.buffer) >= 1 << 16:
+				self.output.write(self.buffer)
+				self.buffer.clear()
+	
+	def write_bits(self, value, n):
+		if value < 0 or value >> n != 0:
+			raise ValueError("Value does not fit in the given number of bits")
+		self.currentbyte = (self.currentbyte << n) | value
+		self.numbitsfilled += n
+		if self.numbitsfilled >= 8:
+			remaining = self.numbitsfilled & 7
+			self.buffer += (self.currentbyte >> remaining).to_bytes(self.numbitsfilled >> 3, "big")
+			self.currentbyte &= (1 << remaining) - 1
+			self.numbitsfilled = remaining
+			if len(self.buffer) >= 1 << 16:
+				self.output.write(self.buffer)
+				self.buffer.clear()
+	
+	def write_bytes(self, b):
 		while self.numbitsfilled != 0:
 			self.write(0)
+		self.buffer += b
+		if len(self.buffer) >= 1 << 16:
+			self.output.write(self.buffer)
+			self.buffer.clear()
+	
+	def flush(self):
+		while self.numbitsfilled != 0:
+			self.write(0)
+		if len(self.buffer) > 0:
+			self.output.write(self.buffer)
+			self.buffer.clear()
+      
+	def close(self):
+		self.flush()
 		self.output.close()
 
-class Encrypt:
-  def __init__(self, action, path):
-    
+_fernet = None
+
+def _get_fernet():
+  global _fernet
+  if _fernet is None:
     if Path("/content/crypto.key").exists():
       with open('/content/crypto.key', 'rb') as filekey:
         key = filekey.read()
-      self.fernet = Fernet(key)
     else:
-      self.fernet = Fernet.generate_key()
+      key = Fernet.generate_key()
       with open("/content/crypto.key", "wb") as key_file:
-        key_file.write(fernet)
+        key_file.write(key)
+    _fernet = Fernet(key)
+  return _fernet
 
-    if action == "encrypt":
-      self.encryption(path)
-    else:
-      self.decryption(path)
+class EncryptedWriter:
+  def __init__(self, out, chunksize=1 << 20):
+    self.output = out
+    self.fernet = _get_fernet()
+    self.chunksize = chunksize
+    self.pending = bytearray()
+    self.error = None
+    self.chunks = queue.Queue(maxsize=4)
+    self.worker = threading.Thread(target=self._encrypt_writer, daemon=True)
+    self.worker.start()
+
+  def write(self, b):
+    if self.error is not None:
+      raise self.error
+    self.pending += b
+    while len(self.pending) > self.chunksize:
+      self.chunks.put((bytes(self.pending[ : self.chunksize]), False))
+      del self.pending[ : self.chunksize]
+
+  def finish(self):
+    if self.error is not None:
+      raise self.error
+    self.chunks.put((bytes(self.pending), True))
+    self.pending.clear()
+
+  def close(self):
+    self.pending.clear()
+    self.chunks.put(None)
+    self.worker.join()
+    self.output.close()
+    if self.error is not None:
+      raise self.error
+
+  def _encrypt_writer(self):
+    index = 0
+    try:
+      while True:
+        item = self.chunks.get()
+        if item is None:
+          return
+        chunk, final = item
+        token = self.fernet.encrypt(struct.pack(">QB", index, final) + chunk)
+        self.output.write(struct.pack(">I", len(token)))
+        self.output.write(token)
+        index += 1
+    except Exception as e:
+      self.error = e
+      while self.chunks.get() is not None:
+        pass
+
+class EncryptedReader:
+  def __init__(self, inp):
+    self.input = inp
+    self.fernet = _get_fernet()
+    self.buffer = b""
+    self.position = 0
+    self.index = 0
+    self.finished = False
+
+  def read(self, n=-1):
+    parts = []
+    while n != 0:
+      if self.position == len(self.buffer):
+        frame = self._read_frame()
+        if frame is None:
+          break
+        self.buffer = frame
+        self.position = 0
+      if n < 0:
+        part = self.buffer[self.position : ]
+      else:
+        part = self.buffer[self.position : self.position + n]
+        n -= len(part)
+      self.position += len(part)
+      parts.append(part)
+    return b"".join(parts)
 
-  def encryption(self, path):
-    with open(path, 'rb') as file:
-      original = file.read()
-    encrypted = self.fernet.encrypt(original)
-    with open(path, 'wb') as encrypted_file:
-      encrypted_file.write(encrypted)
+  def close(self):
+    self.input.close()
 
-  def decryption(self, path):
-    with open(path, 'rb') as enc_file:
-        encrypted = enc_file.read()
-    decrypted = self.fernet.decrypt(encrypted)
-    with open(path, 'wb') as dec_file:
-        dec_file.write(decrypted)
\ No newline at end of file
+  def _read_frame(self):
+    if self.finished:
+      return None
+    header = self.input.read(4)
+    if len(header) == 0:
+      raise ValueError("Stream ended before the final frame")
+    if len(header) < 4:
+      raise ValueError("Truncated frame header")
+    (size,) = struct.unpack(">I", header)
+    token = self.input.read(size)
+    if len(token) < size:
+      raise ValueError("Truncated frame")
+    payload = self.fernet.decrypt(token)
+    if len(payload) < 9:
+      raise ValueError("Truncated frame payload")
+    index, final = struct.unpack(">QB", payload[ : 9])
+    if index != self.index:
+      raise ValueError("Frame out of sequence")
+    self.index += 1
+    if final:
+      self.finished = True
+      if len(self.input.read(1)) != 0:
+        raise ValueError("Data after final frame")
+    return payload[9 : ]
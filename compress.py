@@ -1,4 +1,4 @@
-import contextlib, sys
+import collections, struct, sys
 import code
 
 def main(args):
@@ -7,40 +7,52 @@ def main(args):
 	inputfile, outputfile = args
 	freqs = get_frequencies(inputfile)
 	freqs.increment(256)
-	with open(inputfile, "rb") as inp, \
-			contextlib.closing(code.BitOutputStream(open(outputfile, "wb"))) as bitout:
-		write_frequencies(bitout, freqs)
-		compress(freqs, inp, bitout, outputfile)
-
-	encryptFile = code.Encrypt("encrypt", outputfile)
+	with open(inputfile, "rb") as inp:
+		writer = code.EncryptedWriter(open(outputfile, "wb"))
+		try:
+			bitout = code.BitOutputStream(writer)
+			write_frequencies(bitout, freqs)
+			compress(freqs, inp, bitout, outputfile)
+			bitout.flush()
+			writer.finish()
+		finally:
+			writer.close()
 
 def get_frequencies(filepath):
-	freqs = code.SimpleFrequencyTable([0] * 257)
+	counts = collections.Counter()
 	with open(filepath, "rb") as input:
 		while True:
-			b = input.read(1)
+			b = input.read(1 << 20)
 			if len(b) == 0:
 				break
-			freqs.increment(b[0])
-	return freqs
+			counts.update(b)
+	return code.SimpleFrequencyTable([counts[i] for i in range(257)])
 
 def write_frequencies(bitout, freqs):
-	for i in range(256):
-		write_int(bitout, 32, freqs.get(i))
+	bitout.write_bytes(struct.pack(">256I", *(freqs.get(i) for i in range(256))))
 
 def compress(freqs, inp, bitout, outputfile):
-	enc = code.ArithmeticEncoder(32, bitout)
+	if code.arith_codec is not None:
+		compress_native(freqs, inp, bitout)
+		return
+	enc = code.ArithmeticEncoder32(bitout, checked=False)
 	while True:
-		symbol = inp.read(1)
-		if len(symbol) == 0:
+		block = inp.read(1 << 20)
+		if len(block) == 0:
 			break
-		enc.write(freqs, symbol[0])
+		enc.write_symbols(freqs, memoryview(block))
 	enc.write(freqs, 256)
 	enc.finish()
 
-def write_int(bitout, numbits, value):
-	for i in reversed(range(numbits)):
-		bitout.write((value >> i) & 1)
+def compress_native(freqs, inp, bitout):
+	enc = code.arith_codec.Encoder(32, freqs)
+	while True:
+		block = inp.read(1 << 20)
+		if len(block) == 0:
+			break
+		bitout.write_bytes(enc.write_symbols(block))
+	bitout.write_bytes(enc.write(256))
+	bitout.write_bytes(enc.finish())
 
 if __name__ == "__main__":
 	main(sys.argv[1 : ])
@@ -1,30 +1,34 @@
-import sys
+import struct, sys
 import code
 
 def main(args):
 	if len(args) != 2:
 		sys.exit("Usage: python arithmetic-decompress.py InputFile OutputFile")
 	inputfile, outputfile = args
-	decrypt_file = code.Encrypt("decrypt", inputfile)
-
 	with open(outputfile, "wb") as out, open(inputfile, "rb") as inp:
-		bitin = code.BitInputStream(inp)
+		reader = code.EncryptedReader(inp)
+		bitin = code.BitInputStream(reader)
 		freqs = read_frequencies(bitin)
 		decompress(freqs, bitin, out)
+		while len(reader.read(1 << 20)) > 0:
+			pass
 
 def read_frequencies(bitin):
-	def read_int(n):
-		result = 0
-		for _ in range(n):
-			result = (result << 1) | bitin.read_no_eof()
-		return result
-	
-	freqs = [read_int(32) for _ in range(256)]
+	freqs = list(struct.unpack(">256I", bitin.read_bytes(1024)))
 	freqs.append(1)
 	return code.SimpleFrequencyTable(freqs)
 
 def decompress(freqs, bitin, out):
-	dec = code.ArithmeticDecoder(32, bitin)
+	if code.arith_codec is not None:
+		dec = code.arith_codec.Decoder(32, freqs, 256)
+		while not dec.finished:
+			block = bitin.read_block(1 << 16)
+			if len(block) == 0:
+				out.write(dec.finish())
+				break
+			out.write(dec.read(block))
+		return
+	dec = code.ArithmeticDecoder32(bitin, checked=False)
 	while True:
 		symbol = dec.read(freqs)
 		if symbol == 256:
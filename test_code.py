@@ -0,0 +1,212 @@
+import io, os, random, struct, tempfile, unittest
+from unittest import mock
+from cryptography.fernet import Fernet
+import code, compress, decompress
+
+def make_freqs(data):
+	freqs = [0] * 257
+	for b in data:
+		freqs[b] += 1
+	freqs[256] = 1
+	return freqs
+
+def open_output():
+	out = io.BytesIO()
+	out.close = lambda: None
+	return out, code.BitOutputStream(out)
+
+def encode_per_symbol(data, freqs, encoder=None):
+	out, bitout = open_output()
+	enc = encoder(bitout) if encoder else code.ArithmeticEncoder(32, bitout)
+	table = code.SimpleFrequencyTable(freqs)
+	for b in data:
+		enc.write(table, b)
+	enc.write(table, 256)
+	enc.finish()
+	bitout.close()
+	return out.getvalue()
+
+def encode_batched(data, freqs):
+	out, bitout = open_output()
+	enc = code.ArithmeticEncoder(32, bitout, checked=False)
+	table = code.SimpleFrequencyTable(freqs)
+	enc.write_symbols(table, memoryview(data))
+	enc.write(table, 256)
+	enc.finish()
+	bitout.close()
+	return out.getvalue()
+
+def encode_native(data, freqs):
+	enc = code.arith_codec.Encoder(32, code.SimpleFrequencyTable(freqs))
+	return enc.write_symbols(data) + enc.write(256) + enc.finish()
+
+def decode_python(stream, freqs, decoder=None):
+	bitin = code.BitInputStream(io.BytesIO(stream))
+	dec = decoder(bitin) if decoder else code.ArithmeticDecoder(32, bitin)
+	table = code.SimpleFrequencyTable(freqs)
+	result = bytearray()
+	while True:
+		symbol = dec.read(table)
+		if symbol == 256:
+			return bytes(result)
+		result.append(symbol)
+
+def decode_native(stream, freqs, blocksize):
+	dec = code.arith_codec.Decoder(32, code.SimpleFrequencyTable(freqs), 256)
+	result = bytearray()
+	for i in range(0, len(stream), blocksize):
+		result += dec.read(stream[i : i + blocksize])
+		if dec.finished:
+			return bytes(result)
+	return bytes(result + dec.finish())
+
+class RoundTripTest(unittest.TestCase):
+	def setUp(self):
+		rand = random.Random(42)
+		self.inputs = {
+			"empty": b"",
+			"one": b"a",
+			"skewed": bytes(rand.choice(b"aaaaaaaaaaaaaaaabbbbc\0") for _ in range(20000)),
+			"random": bytes(rand.getrandbits(8) for _ in range(20000)),
+		}
+
+	def test_encoders_agree(self):
+		for (name, data) in self.inputs.items():
+			with self.subTest(name):
+				freqs = make_freqs(data)
+				expected = encode_per_symbol(data, freqs)
+				self.assertEqual(encode_batched(data, freqs), expected)
+				self.assertEqual(encode_per_symbol(data, freqs, code.ArithmeticEncoder32), expected)
+				if code.arith_codec is not None:
+					self.assertEqual(encode_native(data, freqs), expected)
+
+	def test_decoders_round_trip(self):
+		for (name, data) in self.inputs.items():
+			with self.subTest(name):
+				freqs = make_freqs(data)
+				stream = encode_per_symbol(data, freqs)
+				self.assertEqual(decode_python(stream, freqs), data)
+				self.assertEqual(decode_python(stream, freqs, code.ArithmeticDecoder32), data)
+				if code.arith_codec is not None:
+					for blocksize in (1, 7, 1 << 16):
+						self.assertEqual(decode_native(stream, freqs, blocksize), data)
+
+	def test_native_decoder_rejects_truncated_stream(self):
+		if code.arith_codec is None:
+			self.skipTest("arith_codec is not built")
+		data = self.inputs["random"]
+		freqs = make_freqs(data)
+		stream = encode_native(data, freqs)
+		with self.assertRaises(ValueError):
+			decode_native(stream[ : len(stream) // 2], freqs, 1 << 16)
+
+	def test_adaptive_table(self):
+		data = self.inputs["skewed"][ : 3000]
+		for checked in (True, False):
+			with self.subTest(checked=checked):
+				out, bitout = open_output()
+				enc = code.ArithmeticEncoder(32, bitout, checked=checked)
+				table = code.SimpleFrequencyTable([1] * 257)
+				for b in data:
+					enc.write(table, b)
+					table.increment(b)
+				enc.write(table, 256)
+				enc.finish()
+				bitout.close()
+
+				bitin = code.BitInputStream(io.BytesIO(out.getvalue()))
+				dec = code.ArithmeticDecoder(32, bitin, checked=checked)
+				table = code.SimpleFrequencyTable([1] * 257)
+				result = bytearray()
+				while True:
+					symbol = dec.read(table)
+					if symbol == 256:
+						break
+					result.append(symbol)
+					table.increment(symbol)
+				self.assertEqual(bytes(result), data)
+
+class FrequencyTableTest(unittest.TestCase):
+	def test_large_total_symbol_search(self):
+		freqs = [300000, 1, 0, 250000, 7, 200000, 0, 150000] + [1000] * 248 + [1]
+		table = code.SimpleFrequencyTable(freqs)
+		self.assertGreater(table.get_total(), code.SimpleFrequencyTable.SYMBOL_TABLE_LIMIT)
+		boundary = table.get_low(code.SimpleFrequencyTable.LINEAR_SEARCH_LIMIT)
+		rand = random.Random(7)
+		values = [0, 1, boundary - 1, boundary, boundary + 1, table.get_total() - 1]
+		values += [table.get_low(i) for i in range(257) if freqs[i] > 0]
+		values += [table.get_high(i) - 1 for i in range(257) if freqs[i] > 0]
+		values += [rand.randrange(table.get_total()) for _ in range(2000)]
+		for value in values:
+			self.assertEqual(table.get_symbol(value), code.FrequencyTable.get_symbol(table, value))
+		self.assertIsNone(table.symbols)
+
+class EncryptedStreamTest(unittest.TestCase):
+	def setUp(self):
+		self.saved_fernet = code._fernet
+		code._fernet = Fernet(Fernet.generate_key())
+		self.tempdir = tempfile.TemporaryDirectory()
+		self.addCleanup(self.tempdir.cleanup)
+
+	def tearDown(self):
+		code._fernet = self.saved_fernet
+
+	def write_archive(self, data):
+		out = io.BytesIO()
+		out.close = lambda: None
+		writer = code.EncryptedWriter(out, chunksize=16)
+		for i in range(0, len(data), 5):
+			writer.write(data[i : i + 5])
+		writer.finish()
+		writer.close()
+		return out.getvalue()
+
+	def split_frames(self, archive):
+		frames = []
+		while len(archive) > 0:
+			(size,) = struct.unpack(">I", archive[ : 4])
+			frames.append(archive[ : 4 + size])
+			archive = archive[4 + size : ]
+		return frames
+
+	def read_archive(self, archive):
+		return code.EncryptedReader(io.BytesIO(archive)).read()
+
+	def test_round_trip(self):
+		data = bytes(range(256)) * 3
+		frames = self.split_frames(self.write_archive(data))
+		self.assertGreater(len(frames), 3)
+		self.assertEqual(self.read_archive(b"".join(frames)), data)
+		self.assertEqual(self.read_archive(self.write_archive(b"")), b"")
+
+	def test_tampered_archives_are_rejected(self):
+		frames = self.split_frames(self.write_archive(bytes(range(100))))
+		tampered = {
+			"dropped last": frames[ : -1],
+			"swapped": [frames[1], frames[0]] + frames[2 : ],
+			"duplicated final": frames + frames[-1 : ],
+			"trailing bytes": frames + [b"\0"],
+		}
+		for (name, parts) in tampered.items():
+			with self.subTest(name):
+				with self.assertRaises(ValueError):
+					self.read_archive(b"".join(parts))
+
+	def test_interrupted_compress_is_rejected(self):
+		inputfile = os.path.join(self.tempdir.name, "input")
+		archive = os.path.join(self.tempdir.name, "archive")
+		with open(inputfile, "wb") as f:
+			f.write(random.Random(1).randbytes(3 << 20))
+
+		def interrupted(freqs, inp, bitout, outputfile):
+			bitout.write_bytes(inp.read(1 << 20))
+			raise KeyboardInterrupt()
+
+		with mock.patch.object(compress, "compress", interrupted):
+			with self.assertRaises(KeyboardInterrupt):
+				compress.main([inputfile, archive])
+		with self.assertRaises(ValueError):
+			decompress.main([archive, os.path.join(self.tempdir.name, "output")])
+
+if __name__ == "__main__":
+	unittest.main()